@@ -6,59 +6,53 @@ Main FastAPI application for handling Halloween order processing
 import os
 import signal
 import asyncio
+import time
 from contextlib import asynccontextmanager
-from datetime import datetime
 
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from fastapi.exceptions import RequestValidationError
+from starlette.datastructures import URL, Headers
+import orjson
 import structlog
 import uvicorn
 
 from routes.orders import router as orders_router
-from services.product_service import product_service
+from services.product_service import get_product_service, reset_product_service
+from utils.clock import iso_now
 
 # Configure structured logging for Docker/CloudWatch
 import sys
 import logging
 
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+
 # Configure Python logging to go to stdout
 logging.basicConfig(
-    level=logging.INFO,
+    level=LOG_LEVEL,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
     stream=sys.stdout,
     force=True
 )
 
-# Configure structured logging  
+# Configure structured logging (orjson renders bytes straight to stdout)
 structlog.configure(
     processors=[
-        structlog.stdlib.filter_by_level,
-        structlog.stdlib.add_logger_name,
-        structlog.stdlib.add_log_level,
-        structlog.stdlib.PositionalArgumentsFormatter(),
+        structlog.processors.add_log_level,
         structlog.processors.TimeStamper(fmt="iso"),
         structlog.processors.StackInfoRenderer(),
         structlog.processors.format_exc_info,
-        structlog.processors.UnicodeDecoder(),
-        structlog.processors.JSONRenderer()
+        structlog.processors.JSONRenderer(serializer=orjson.dumps)
     ],
     context_class=dict,
-    logger_factory=structlog.stdlib.LoggerFactory(),
-    wrapper_class=structlog.stdlib.BoundLogger,
+    logger_factory=structlog.BytesLoggerFactory(),
+    wrapper_class=structlog.make_filtering_bound_logger(logging.getLevelName(LOG_LEVEL)),
     cache_logger_on_first_use=True,
 )
 
 logger = structlog.get_logger()
 
-# Force stdout to be unbuffered for immediate Docker log output
-sys.stdout.reconfigure(line_buffering=True)
-sys.stderr.reconfigure(line_buffering=True)
-
-# Test logging on startup
-print("🚨 [STARTUP] Order Service Python logging test - this should appear in CloudWatch!")
-sys.stdout.flush()
 logger.info("Order Service structlog test - structured logging initialized")
 
 # Environment configuration
@@ -66,10 +60,39 @@ PORT = int(os.getenv("PORT", 3002))
 HOST = os.getenv("HOST", "0.0.0.0")
 ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
 PRODUCT_SERVICE_URL = os.getenv("PRODUCT_SERVICE_URL", "http://localhost:3001")
+DEBUG_POST_ORDERS = os.getenv("DEBUG_POST_ORDERS") == "1"
 
 # Global shutdown event
 shutdown_event = asyncio.Event()
 
+# Cached Product Service health so /health probes don't hit the dependency
+_HEALTH_TTL = 5.0
+_health_cache = {"healthy": None}
+
+
+async def _refresh_product_service_health() -> bool:
+    """Check Product Service health and store the result in the cache"""
+    product_service = await get_product_service()
+    healthy = await product_service.health_check()
+    _health_cache["healthy"] = healthy
+    return healthy
+
+
+async def _health_refresher():
+    """Poll Product Service health in the background so startup and /health never wait on it"""
+    while True:
+        try:
+            previous = _health_cache["healthy"]
+            is_healthy = await _refresh_product_service_health()
+            if is_healthy != previous:
+                if is_healthy:
+                    logger.info("Product Service is healthy", url=PRODUCT_SERVICE_URL)
+                else:
+                    logger.warning("Product Service health check failed", url=PRODUCT_SERVICE_URL)
+        except Exception as e:
+            logger.error("Failed to check Product Service health", error=str(e))
+        await asyncio.sleep(_HEALTH_TTL)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -78,18 +101,12 @@ async def lifespan(app: FastAPI):
     logger.info("Starting SpookyMart Order Processing Service", 
                port=PORT, environment=ENVIRONMENT)
     
-    # Configure Product Service URL
+    # Create the Product Service client inside the running loop
+    product_service = await get_product_service()
     product_service.base_url = PRODUCT_SERVICE_URL
     
-    # Check Product Service health
-    try:
-        is_healthy = await product_service.health_check()
-        if is_healthy:
-            logger.info("Product Service is healthy", url=PRODUCT_SERVICE_URL)
-        else:
-            logger.warning("Product Service health check failed", url=PRODUCT_SERVICE_URL)
-    except Exception as e:
-        logger.error("Failed to check Product Service health", error=str(e))
+    # Check Product Service health in the background instead of blocking startup
+    health_task = asyncio.create_task(_health_refresher())
     
     # Create data directory if it doesn't exist
     os.makedirs("data", exist_ok=True)
@@ -98,6 +115,8 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("Shutting down SpookyMart Order Processing Service")
+    health_task.cancel()
+    await reset_product_service()
 
 
 # Create FastAPI application
@@ -107,13 +126,20 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs" if ENVIRONMENT == "development" else None,
     redoc_url="/redoc" if ENVIRONMENT == "development" else None,
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
-# CORS middleware
+# CORS middleware ("*" keeps Starlette on its allow-all fast path)
+_origins_env = os.getenv("ALLOWED_ORIGINS", "*")
+ALLOWED_ORIGINS = (
+    ["*"] if _origins_env.strip() == "*"
+    else [o.strip() for o in _origins_env.split(",") if o.strip()]
+)
+
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=os.getenv("ALLOWED_ORIGINS", "*").split(","),
+    allow_origins=ALLOWED_ORIGINS,
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
     allow_headers=["*"],
@@ -121,58 +147,68 @@ app.add_middleware(
 
 
 # Request logging middleware
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    """Log all HTTP requests"""
-    start_time = datetime.utcnow()
-    
-    # Special debug logging for POST orders (WITHOUT consuming body)
-    if request.method == "POST" and "/api/orders" in str(request.url):
-        print("=" * 120)
-        print("🚨🚨🚨 [CRITICAL DEBUG] POST REQUEST HIT ORDER SERVICE MAIN APP! 🚨🚨🚨")
-        print("=" * 120)
-        print(f"🚨 [DEBUG] Request method: {request.method}")
-        print(f"🚨 [DEBUG] Request URL: {request.url}")
-        print(f"🚨 [DEBUG] Request path: {request.url.path}")
-        print(f"🚨 [DEBUG] Client IP: {request.client.host if request.client else 'unknown'}")
-        print(f"🚨 [DEBUG] Headers: {dict(request.headers)}")
-        print(f"🚨 [DEBUG] Content-Type: {request.headers.get('content-type', 'unknown')}")
-        print(f"🚨 [DEBUG] Content-Length: {request.headers.get('content-length', 'unknown')}")
-        print("🚨 [DEBUG] This proves the POST request reached the Order Service!")
-        print("🚨 [DEBUG] NOT reading body in middleware to allow route handler to process it")
-        print("=" * 120)
-    
-    # Log request
-    logger.info("HTTP request started",
-               method=request.method,
-               url=str(request.url),
-               client_ip=request.client.host if request.client else None)
-    
-    # Process request
-    response = await call_next(request)
-    
-    # Calculate duration
-    duration = (datetime.utcnow() - start_time).total_seconds()
-    
-    # Special debug logging for POST orders response
-    if request.method == "POST" and "/api/orders" in str(request.url):
-        print("=" * 120)
-        print("🚨🚨🚨 [CRITICAL DEBUG] POST ORDER RESPONSE FROM ORDER SERVICE! 🚨🚨🚨")
-        print("=" * 120)
-        print(f"🚨 [DEBUG] Response status: {response.status_code}")
-        print(f"🚨 [DEBUG] Response headers: {dict(response.headers)}")
-        print(f"🚨 [DEBUG] Duration: {duration:.3f} seconds")
-        print("🚨 [DEBUG] About to return response to API Gateway!")
-        print("=" * 120)
-    
-    # Log response
-    logger.info("HTTP request completed",
-               method=request.method,
-               url=str(request.url),
-               status_code=response.status_code,
-               duration_seconds=duration)
-    
-    return response
+class RequestLogMiddleware:
+    """Log all HTTP requests as a plain ASGI middleware"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        method = scope["method"]
+        url = str(URL(scope=scope))
+        client = scope.get("client")
+        client_ip = client[0] if client else None
+        is_post_order = DEBUG_POST_ORDERS and method == "POST" and scope["path"].startswith("/api/orders")
+
+        # Special debug logging for POST orders (WITHOUT consuming body)
+        if is_post_order:
+            headers = Headers(scope=scope)
+            logger.debug("POST order request received",
+                        path=scope["path"],
+                        client_ip=client_ip,
+                        content_type=headers.get("content-type"),
+                        content_length=headers.get("content-length"))
+
+        # Log request
+        logger.info("HTTP request started",
+                   method=method,
+                   url=url,
+                   client_ip=client_ip)
+
+        response_status = {}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                response_status["code"] = message["status"]
+            await send(message)
+
+        # Process request
+        await self.app(scope, receive, send_wrapper)
+
+        # Calculate duration
+        duration = time.perf_counter() - start
+        status_code = response_status.get("code")
+
+        # Special debug logging for POST orders response
+        if is_post_order:
+            logger.debug("POST order response sent",
+                        status_code=status_code,
+                        duration_seconds=duration)
+
+        # Log response
+        logger.info("HTTP request completed",
+                   method=method,
+                   url=url,
+                   status_code=status_code,
+                   duration_seconds=duration)
+
+
+app.add_middleware(RequestLogMiddleware)
 
 
 # Exception handlers
@@ -183,7 +219,7 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
                   url=str(request.url),
                   errors=exc.errors())
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=422,
         content={
             "success": False,
@@ -202,7 +238,7 @@ async def general_exception_handler(request: Request, exc: Exception):
                 error=str(exc),
                 exc_info=True)
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={
             "success": False,
@@ -213,81 +249,123 @@ async def general_exception_handler(request: Request, exc: Exception):
 
 
 # Health check endpoint
-@app.get("/health")
-async def health_check():
-    """Health check endpoint for ECS monitoring"""
+# Serialized health body, rebuilt only when the dependency state or second changes
+_health_response_cache = {"key": None, "status_code": 503, "body": b""}
+
+
+async def _health_response():
+    """Build the /health status code and JSON body"""
     try:
-        # Check Product Service health
-        product_service_healthy = await product_service.health_check()
+        # Product Service health is polled in the background; None until the first check
+        product_service_healthy = _health_cache["healthy"]
         
-        health_status = {
-            "status": "healthy",
-            "service": "spookymart-order-service",
-            "version": "1.0.0",
-            "timestamp": datetime.utcnow().isoformat(),
-            "environment": ENVIRONMENT,
-            "dependencies": {
-                "product_service": {
-                    "url": PRODUCT_SERVICE_URL,
-                    "healthy": product_service_healthy
+        timestamp = iso_now()
+        key = (product_service_healthy, timestamp)
+        if _health_response_cache["key"] != key:
+            health_status = {
+                "status": "healthy",
+                "service": "spookymart-order-service",
+                "version": "1.0.0",
+                "timestamp": timestamp,
+                "environment": ENVIRONMENT,
+                "dependencies": {
+                    "product_service": {
+                        "url": PRODUCT_SERVICE_URL,
+                        "healthy": product_service_healthy
+                    }
                 }
             }
-        }
-        
-        # If any dependency is unhealthy, mark service as degraded
-        if not product_service_healthy:
-            health_status["status"] = "degraded"
-            health_status["message"] = "Some dependencies are unhealthy"
-        
-        status_code = 200 if health_status["status"] == "healthy" else 503
+            
+            # If any dependency is unhealthy or not yet checked, report it
+            if product_service_healthy is None:
+                health_status["status"] = "unknown"
+                health_status["message"] = "Dependency health not checked yet"
+            elif not product_service_healthy:
+                health_status["status"] = "degraded"
+                health_status["message"] = "Some dependencies are unhealthy"
+            
+            _health_response_cache["key"] = key
+            _health_response_cache["status_code"] = 200 if health_status["status"] == "healthy" else 503
+            _health_response_cache["body"] = orjson.dumps(health_status)
         
-        return JSONResponse(
-            status_code=status_code,
-            content=health_status
-        )
+        return _health_response_cache["status_code"], _health_response_cache["body"]
         
     except Exception as e:
         logger.error("Health check failed", error=str(e))
-        return JSONResponse(
-            status_code=503,
-            content={
-                "status": "unhealthy",
-                "service": "spookymart-order-service",
-                "version": "1.0.0",
-                "timestamp": datetime.utcnow().isoformat(),
-                "error": str(e)
-            }
-        )
+        return 503, orjson.dumps({
+            "status": "unhealthy",
+            "service": "spookymart-order-service",
+            "version": "1.0.0",
+            "timestamp": iso_now(),
+            "error": str(e)
+        })
+
+
+@app.get("/health")
+async def health_check():
+    """Health check endpoint for ECS monitoring"""
+    status_code, body = await _health_response()
+    return Response(content=body, status_code=status_code, media_type="application/json")
+
+
+class HealthProbeMiddleware:
+    """Answer GET /health before CORS, request logging and routing run"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] != "/health" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        status_code, body = await _health_response()
+        await send({
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("latin-1")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+# Added last so it is the outermost middleware
+app.add_middleware(HealthProbeMiddleware)
+
+
+# API information endpoint (static for the life of the process, serialized once)
+_API_INFO_BYTES = orjson.dumps({
+    "service": "SpookyMart Order Processing Service",
+    "version": "1.0.0",
+    "description": "Halloween ecommerce order management API",
+    "environment": ENVIRONMENT,
+    "endpoints": {
+        "health": "GET /health",
+        "orders": {
+            "list": "GET /api/orders",
+            "create": "POST /api/orders",
+            "get": "GET /api/orders/{order_id}",
+            "update": "PUT /api/orders/{order_id}",
+            "cancel": "POST /api/orders/{order_id}/cancel",
+            "status": "GET /api/orders/{order_id}/status"
+        }
+    },
+    "documentation": {
+        "swagger": "/docs" if ENVIRONMENT == "development" else "disabled",
+        "redoc": "/redoc" if ENVIRONMENT == "development" else "disabled"
+    },
+    "dependencies": {
+        "product_service": PRODUCT_SERVICE_URL
+    }
+})
 
 
-# API information endpoint
 @app.get("/")
 async def api_info():
     """API information and documentation"""
-    return {
-        "service": "SpookyMart Order Processing Service",
-        "version": "1.0.0",
-        "description": "Halloween ecommerce order management API",
-        "environment": ENVIRONMENT,
-        "endpoints": {
-            "health": "GET /health",
-            "orders": {
-                "list": "GET /api/orders",
-                "create": "POST /api/orders",
-                "get": "GET /api/orders/{order_id}",
-                "update": "PUT /api/orders/{order_id}",
-                "cancel": "POST /api/orders/{order_id}/cancel",
-                "status": "GET /api/orders/{order_id}/status"
-            }
-        },
-        "documentation": {
-            "swagger": "/docs" if ENVIRONMENT == "development" else "disabled",
-            "redoc": "/redoc" if ENVIRONMENT == "development" else "disabled"
-        },
-        "dependencies": {
-            "product_service": PRODUCT_SERVICE_URL
-        }
-    }
+    return Response(content=_API_INFO_BYTES, media_type="application/json")
 
 
 # Include routers
@@ -314,6 +392,9 @@ async def main():
         port=PORT,
         log_config=None,  # Use our structured logging
         access_log=False,  # We handle request logging in middleware
+        loop="uvloop",  # libuv event loop instead of stock asyncio
+        http="httptools",  # C HTTP parser instead of pure-Python h11
+        interface="asgi3",
     )
     
     server = uvicorn.Server(config)
@@ -348,21 +429,14 @@ async def main():
 
 
 if __name__ == "__main__":
-    # Simple startup for development
-    if ENVIRONMENT == "development":
-        print("\n🎃 SpookyMart Order Processing Service is starting...")
-        print(f"📍 Server: http://{HOST}:{PORT}")
-        print(f"🏥 Health: http://{HOST}:{PORT}/health")
-        print(f"📦 Orders: http://{HOST}:{PORT}/api/orders")
-        print(f"📚 API Docs: http://{HOST}:{PORT}/docs")
-        print(f"🔗 Product Service: {PRODUCT_SERVICE_URL}")
-        print("\n👻 Ready to process some spooky orders!\n")
-    
     # Run the server directly with uvicorn
     uvicorn.run(
         app,
         host=HOST,
         port=PORT,
         log_config=None,
-        access_log=False
+        access_log=False,
+        loop="uvloop",
+        http="httptools",
+        interface="asgi3"
     )
@@ -3,10 +3,13 @@ Simplified Order Models for SpookyMart Order Processing Service
 No validation, minimal structure for demo purposes
 """
 
-from datetime import datetime
+import operator
+from datetime import datetime, timezone
 from typing import List, Optional, Dict, Any
 from uuid import uuid4
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
+
+_UTC = timezone.utc
 
 
 class OrderItem(BaseModel):
@@ -28,7 +31,7 @@ class ShippingAddress(BaseModel):
 
 class Order(BaseModel):
     """Simplified Order model - no validation"""
-    id: str = ""
+    id: str = Field(default_factory=lambda: uuid4().hex)
     customer_email: str = ""
     customer_name: str = ""
     customer_phone: str = ""
@@ -36,28 +39,17 @@ class Order(BaseModel):
     shipping_address: ShippingAddress = ShippingAddress()
     status: str = "pending"
     total_amount: float = 0.0
-    created_at: str = ""
+    created_at: str = Field(default_factory=lambda: datetime.now(_UTC).isoformat())
     
-    def __init__(self, **data):
-        # Set defaults
-        if not data.get('id'):
-            data['id'] = str(uuid4())
-        if not data.get('created_at'):
-            data['created_at'] = datetime.utcnow().isoformat()
-        if not data.get('status'):
-            data['status'] = 'pending'
-        
-        # Calculate total if items provided
-        if data.get('items'):
-            total = 0.0
-            for item in data['items']:
-                if isinstance(item, dict):
-                    total += item.get('quantity', 1) * item.get('unit_price', 0.0)
-                else:
-                    total += item.quantity * item.unit_price
-            data['total_amount'] = total
-        
-        super().__init__(**data)
+    @model_validator(mode="after")
+    def calculate_total(self) -> "Order":
+        # Calculate total if items provided, over parallel quantity/price
+        # columns so the multiply-add runs in C via map(operator.mul, ...)
+        if self.items:
+            qtys = tuple(i.quantity for i in self.items)
+            prices = tuple(i.unit_price for i in self.items)
+            self.total_amount = sum(map(operator.mul, qtys, prices))
+        return self
 
 
 class OrderCreate(BaseModel):
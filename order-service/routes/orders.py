@@ -1,22 +1,33 @@
 """
 Order Routes for SpookyMart Order Processing Service
-Simplified for demo - no file storage, stdout printing only
+Simplified for demo - no file storage, in-memory only
+
+Handlers run directly on the event loop (async def, no threadpool hop), so
+they must not block: no print/stdout writes or other synchronous I/O here.
+A handler that needs blocking work should be declared with plain def.
 """
 
-import json
-from datetime import datetime
+import math
+from collections import OrderedDict
 from typing import Dict, Any
 from uuid import uuid4
 
-from fastapi import APIRouter, HTTPException, Body
+from fastapi import APIRouter, HTTPException, Body, Response
 from fastapi.responses import JSONResponse
+import orjson
+import structlog
+
+from models.order import Order, OrderCreate
+from utils.clock import iso_now
+from utils.routing import ORJSONRoute
 
-from models.order import Order, OrderCreate, OrderResponse, OrderListResponse
+logger = structlog.get_logger()
 
-router = APIRouter()
+router = APIRouter(route_class=ORJSONRoute)
 
-# In-memory storage for demo (will be lost on restart)
-orders_storage = {}
+# In-memory storage for demo (will be lost on restart), capped with LRU eviction
+_MAX_ORDERS = 10_000
+orders_storage: "OrderedDict[str, dict]" = OrderedDict()
 
 # Dummy data for demo
 DUMMY_ORDERS = [
@@ -100,26 +111,26 @@ DUMMY_ORDERS = [
     }
 ]
 
+# Dummy orders indexed by id for O(1) lookups
+DUMMY_ORDERS_BY_ID = {order["id"]: order for order in DUMMY_ORDERS}
+
+# The dummy order list never changes, so serialize its response once
+_DUMMY_ORDERS_RESPONSE_BYTES = orjson.dumps({
+    "success": True,
+    "orders": DUMMY_ORDERS,
+    "total": len(DUMMY_ORDERS)
+})
+
 
-@router.get("/", response_model=OrderListResponse)
+@router.get("/")
 async def get_orders():
     """Get all orders - returns dummy data for demo"""
     try:
-        print("=" * 80)
-        print("🚨 [DEBUG] GET ORDERS REQUEST RECEIVED! 🚨")
-        print("🚨 [DEBUG] FastAPI Order Service is ALIVE and processing GET /api/orders")
-        print("🚨 [DEBUG] Request reached Order Service successfully!")
-        print("=" * 80)
-        print("🎃 GET ORDERS REQUEST - Returning dummy data for demo")
-        print(f"📦 Total dummy orders: {len(DUMMY_ORDERS)}")
+        logger.debug("Returning dummy orders", total=len(DUMMY_ORDERS))
         
-        return OrderListResponse(
-            success=True,
-            orders=DUMMY_ORDERS,
-            total=len(DUMMY_ORDERS)
-        )
+        return Response(content=_DUMMY_ORDERS_RESPONSE_BYTES, media_type="application/json")
     except Exception as e:
-        print(f"❌ Error getting orders: {str(e)}")
+        logger.error("Error getting orders", error=str(e))
         raise HTTPException(status_code=500, detail={
             "error": "Internal Server Error",
             "message": "Failed to retrieve orders"
@@ -130,29 +141,20 @@ async def get_orders():
 async def get_order(order_id: str):
     """Get a specific order by ID"""
     try:
-        print(f"🎃 GET ORDER REQUEST - ID: {order_id}")
-        
-        # Check in-memory storage first
-        if order_id in orders_storage:
-            order = orders_storage[order_id]
-            print(f"📦 Found order in memory: {order_id}")
-            return OrderResponse(
-                success=True,
-                message="Order retrieved successfully",
-                order=order
-            )
-        
-        # Check dummy data
-        for order in DUMMY_ORDERS:
-            if order["id"] == order_id:
-                print(f"📦 Found order in dummy data: {order_id}")
-                return OrderResponse(
-                    success=True,
-                    message="Order retrieved successfully",
-                    order=order
-                )
+        # Check in-memory storage first, then dummy data
+        order = orders_storage.get(order_id)
+        if order is not None:
+            orders_storage.move_to_end(order_id)
+        else:
+            order = DUMMY_ORDERS_BY_ID.get(order_id)
+        if order is not None:
+            return {
+                "success": True,
+                "message": "Order retrieved successfully",
+                "order": order
+            }
         
-        print(f"❌ Order not found: {order_id}")
+        logger.debug("Order not found", order_id=order_id)
         raise HTTPException(status_code=404, detail={
             "error": "Not Found",
             "message": f"Order {order_id} not found"
@@ -161,33 +163,21 @@ async def get_order(order_id: str):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error getting order {order_id}: {str(e)}")
+        logger.error("Error getting order", order_id=order_id, error=str(e))
         raise HTTPException(status_code=500, detail={
             "error": "Internal Server Error",
             "message": f"Failed to retrieve order {order_id}"
         })
 
 
-@router.post("/", response_model=OrderResponse)
+@router.post("/")
 async def create_order(order_data: Dict[str, Any] = Body(...)):
-    """Create a new order - prints to stdout, stores in memory"""
+    """Create a new order - stores in memory"""
     try:
-        print("=" * 100)
-        print("🚨🚨🚨 [CRITICAL DEBUG] POST ORDER REQUEST RECEIVED! 🚨🚨🚨")
-        print("=" * 100)
-        print("🚨 [DEBUG] FastAPI Order Service is ALIVE and processing POST /api/orders")
-        print("🚨 [DEBUG] POST request successfully reached Order Service!")
-        print(f"🚨 [DEBUG] Raw request data type: {type(order_data)}")
-        print(f"🚨 [DEBUG] Raw request data: {json.dumps(order_data, indent=2)}")
-        print("🚨 [DEBUG] This proves API Gateway routing is working!")
-        print("=" * 100)
-        
         # Generate order ID
-        order_id = str(uuid4())
-        print(f"🚨 [DEBUG] Generated Order ID: {order_id}")
+        order_id = uuid4().hex
         
         # Create order with minimal validation
-        print("🚨 [DEBUG] Processing order data...")
         order = {
             "id": order_id,
             "customer_email": order_data.get("customer_email", ""),
@@ -197,67 +187,34 @@ async def create_order(order_data: Dict[str, Any] = Body(...)):
             "shipping_address": order_data.get("shipping_address", {}),
             "status": "pending",
             "total_amount": 0.0,
-            "created_at": datetime.utcnow().isoformat()
+            "created_at": iso_now()
         }
-        print(f"🚨 [DEBUG] Order object created: {json.dumps(order, indent=2)}")
         
         # Calculate total
-        print("🚨 [DEBUG] Calculating order total...")
-        total = 0.0
-        for i, item in enumerate(order["items"]):
-            quantity = item.get("quantity", 1)
-            unit_price = item.get("unit_price", 0.0)
-            item_total = quantity * unit_price
-            print(f"🚨 [DEBUG] Item {i+1}: {quantity} x ${unit_price} = ${item_total}")
-            total += item_total
+        total = math.fsum(
+            item.get("quantity", 1) * item.get("unit_price", 0.0)
+            for item in order["items"]
+        )
         order["total_amount"] = total
-        print(f"🚨 [DEBUG] Final total calculated: ${total}")
         
-        # Store in memory
-        print("🚨 [DEBUG] Storing order in memory...")
+        # Store in memory, evicting the least recently used order when full
         orders_storage[order_id] = order
-        print(f"🚨 [DEBUG] Order stored! Memory now contains {len(orders_storage)} orders")
-        
-        # Print to stdout for demo
-        print("🎃" * 50)
-        print("🎃 NEW SPOOKYMART ORDER CREATED! 🎃")
-        print("🎃" * 50)
-        print(f"📧 Customer: {order['customer_name']} ({order['customer_email']})")
-        print(f"📞 Phone: {order['customer_phone']}")
-        print(f"🆔 Order ID: {order_id}")
-        print(f"💰 Total: ${order['total_amount']:.2f}")
-        print("📦 Items:")
-        for i, item in enumerate(order["items"], 1):
-            print(f"   {i}. {item.get('product_name', 'Unknown')} x{item.get('quantity', 1)} @ ${item.get('unit_price', 0):.2f}")
-        print(f"🏠 Shipping to: {order['shipping_address'].get('street', '')}, {order['shipping_address'].get('city', '')}")
-        print(f"⏰ Created: {order['created_at']}")
-        print("🎃" * 50)
+        if len(orders_storage) > _MAX_ORDERS:
+            orders_storage.popitem(last=False)
         
-        print("🚨 [DEBUG] Creating OrderResponse...")
-        response = OrderResponse(
-            success=True,
-            message="Order created successfully",
-            order=order
-        )
-        print("🚨 [DEBUG] OrderResponse created successfully!")
-        print("🚨 [DEBUG] About to return successful response to API Gateway")
-        print("=" * 100)
+        logger.debug("Order created",
+                    order_id=order_id,
+                    item_count=len(order["items"]),
+                    total_amount=total)
         
-        return response
+        return {
+            "success": True,
+            "message": "Order created successfully",
+            "order": order
+        }
         
     except Exception as e:
-        print("=" * 100)
-        print("🚨🚨🚨 [CRITICAL ERROR] POST ORDER FAILED! 🚨🚨🚨")
-        print("=" * 100)
-        print(f"🚨 [ERROR] Exception type: {type(e).__name__}")
-        print(f"� [ERROR] Exception message: {str(e)}")
-        print(f"🚨 [ERROR] Exception args: {e.args}")
-        
-        import traceback
-        print("🚨 [ERROR] Full traceback:")
-        print(traceback.format_exc())
-        print("=" * 100)
-        
+        logger.error("Failed to create order", error=str(e), exc_info=True)
         raise HTTPException(status_code=500, detail={
             "error": "Internal Server Error",
             "message": "Failed to create order",
@@ -269,8 +226,6 @@ async def create_order(order_data: Dict[str, Any] = Body(...)):
 async def update_order(order_id: str, update_data: Dict[str, Any]):
     """Update an order"""
     try:
-        print(f"🎃 UPDATE ORDER REQUEST - ID: {order_id}")
-        
         if order_id not in orders_storage:
             raise HTTPException(status_code=404, detail={
                 "error": "Not Found",
@@ -279,23 +234,23 @@ async def update_order(order_id: str, update_data: Dict[str, Any]):
         
         # Update order
         order = orders_storage[order_id]
+        orders_storage.move_to_end(order_id)
         for key, value in update_data.items():
             if key in order:
                 order[key] = value
         
-        print(f"✅ Order {order_id} updated successfully")
-        print(f"📝 Updated fields: {list(update_data.keys())}")
+        logger.debug("Order updated", order_id=order_id, fields=list(update_data))
         
-        return OrderResponse(
-            success=True,
-            message="Order updated successfully",
-            order=order
-        )
+        return {
+            "success": True,
+            "message": "Order updated successfully",
+            "order": order
+        }
         
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error updating order {order_id}: {str(e)}")
+        logger.error("Error updating order", order_id=order_id, error=str(e))
         raise HTTPException(status_code=500, detail={
             "error": "Internal Server Error",
             "message": f"Failed to update order {order_id}"
@@ -306,11 +261,9 @@ async def update_order(order_id: str, update_data: Dict[str, Any]):
 async def cancel_order(order_id: str):
     """Cancel/delete an order"""
     try:
-        print(f"🎃 CANCEL ORDER REQUEST - ID: {order_id}")
-        
         if order_id in orders_storage:
             del orders_storage[order_id]
-            print(f"✅ Order {order_id} cancelled successfully")
+            logger.debug("Order cancelled", order_id=order_id)
             
             return {
                 "success": True,
@@ -325,7 +278,7 @@ async def cancel_order(order_id: str):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error cancelling order {order_id}: {str(e)}")
+        logger.error("Error cancelling order", order_id=order_id, error=str(e))
         raise HTTPException(status_code=500, detail={
             "error": "Internal Server Error",
             "message": f"Failed to cancel order {order_id}"
@@ -336,11 +289,9 @@ async def cancel_order(order_id: str):
 async def get_order_status(order_id: str):
     """Get order status"""
     try:
-        print(f"🎃 GET ORDER STATUS - ID: {order_id}")
-        
-        # Check in-memory storage
-        if order_id in orders_storage:
-            order = orders_storage[order_id]
+        # Check in-memory storage first, then dummy data
+        order = orders_storage.get(order_id) or DUMMY_ORDERS_BY_ID.get(order_id)
+        if order is not None:
             return {
                 "success": True,
                 "order_id": order_id,
@@ -348,16 +299,6 @@ async def get_order_status(order_id: str):
                 "created_at": order["created_at"]
             }
         
-        # Check dummy data
-        for order in DUMMY_ORDERS:
-            if order["id"] == order_id:
-                return {
-                    "success": True,
-                    "order_id": order_id,
-                    "status": order["status"],
-                    "created_at": order["created_at"]
-                }
-        
         raise HTTPException(status_code=404, detail={
             "error": "Not Found",
             "message": f"Order {order_id} not found"
@@ -366,7 +307,7 @@ async def get_order_status(order_id: str):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error getting order status {order_id}: {str(e)}")
+        logger.error("Error getting order status", order_id=order_id, error=str(e))
         raise HTTPException(status_code=500, detail={
             "error": "Internal Server Error",
             "message": f"Failed to get order status for {order_id}"
@@ -4,27 +4,221 @@ Handles communication with the Product Service
 """
 
 import asyncio
-from typing import Dict, List, Optional
+import atexit
+import concurrent.futures
+import operator
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 import httpx
+import anyio
+import ijson
+import orjson
 import structlog
-from datetime import datetime
+import tenacity
 
 logger = structlog.get_logger()
 
+# Order item fields read in the validation loop, with their defaults
+_ITEM_DEFAULTS = {'product_id': None, 'quantity': 0, 'unit_price': 0}
+_item_fields = operator.itemgetter('product_id', 'quantity', 'unit_price', 'unit_price_cents')
+
+# Upper bound on concurrently validated order items
+_VALIDATION_CONCURRENCY = 32
+
+# Retry transient connection failures; read/write/pool timeouts already
+# spent their full budget and fail straight away
+_retry_transient = tenacity.retry(
+    stop=tenacity.stop_after_attempt(3),
+    wait=tenacity.wait_exponential_jitter(initial=0.05, max=0.5),
+    retry=(
+        tenacity.retry_if_exception_type(httpx.TransportError)
+        & tenacity.retry_if_not_exception_type(
+            (httpx.ReadTimeout, httpx.WriteTimeout, httpx.PoolTimeout)
+        )
+    ),
+    reraise=True
+)
+
+# Cap on cached products and ETags; IDs come from client orders, so the
+# caches evict least recently used entries instead of growing unbounded
+_MAX_CACHED_PRODUCTS = 10_000
+
+# Bulk responses for at least this many IDs are parsed as they stream in
+_STREAM_MIN_IDS = 10
+
+# Default cap on per-product GETs in flight when the bulk endpoint is unavailable
+_FETCH_CONCURRENCY = 25
+
+
+def _cents(price: float) -> int:
+    """Price as integer cents so comparisons are exact"""
+    return int(round(price * 100))
+
 
 class ProductServiceError(Exception):
     """Custom exception for Product Service errors"""
     pass
 
 
+class ProductServiceUnavailable(ProductServiceError):
+    """Product Service is down or degraded (timeout, transport error, 5xx)"""
+    pass
+
+
+def _decode_body(content: bytes) -> Dict:
+    """
+    Decode a buffered Product Service response body
+    
+    Returns:
+        The decoded JSON object, with success already checked
+        
+    Raises:
+        ProductServiceError: If the body is not a JSON object or reports failure
+    """
+    try:
+        data = orjson.loads(content)
+    except orjson.JSONDecodeError as e:
+        logger.error("Product service returned invalid JSON", error=str(e))
+        raise ProductServiceError(f"Product service returned invalid JSON: {e}") from e
+    
+    if not isinstance(data, dict):
+        logger.error("Product service returned unexpected response", data=data)
+        raise ProductServiceError("Product service returned unexpected response")
+    
+    if not data.get('success'):
+        logger.error("Product service returned unsuccessful response", data=data)
+        raise ProductServiceError("Product service returned unsuccessful response")
+    
+    return data
+
+
+@dataclass(slots=True, frozen=True)
+class Product:
+    """Product record built once after decode; raw keeps the full payload"""
+    id: str
+    price: float
+    stock: int
+    is_active: bool
+    price_cents: int
+    raw: Dict
+    
+    @classmethod
+    def from_raw(cls, raw: Dict) -> "Product":
+        price = raw.get('price', 0)
+        return cls(
+            id=raw.get('id'),
+            price=price,
+            price_cents=_cents(price),
+            stock=raw.get('stock', 0),
+            is_active=raw.get('isActive', False),
+            raw=raw
+        )
+
+
+class _AsyncByteReader:
+    """Minimal async file-like wrapper so ijson can read an httpx byte stream"""
+    
+    def __init__(self, chunks):
+        self._chunks = chunks.__aiter__()
+    
+    async def read(self, n: int = -1) -> bytes:
+        # ijson probes the stream type with read(0); don't consume a chunk for it
+        if n == 0:
+            return b""
+        try:
+            return await self._chunks.__anext__()
+        except StopAsyncIteration:
+            return b""
+
+
 class ProductService:
     """Service class for interacting with the Product Service"""
     
     def __init__(self, base_url: str = "http://localhost:3001"):
         self.base_url = base_url.rstrip('/')
         self.timeout = 5.0
+        self._client: Optional[httpx.AsyncClient] = None
+        # Short-lived product cache plus in-flight fetches shared by concurrent callers
+        self.cache_ttl = 5.0
+        self._cache: "OrderedDict[str, Tuple[float, Optional[Product]]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        # Last ETag and parsed body per product, for conditional GETs once the TTL expires
+        self._etag_cache: "OrderedDict[str, Tuple[str, Product]]" = OrderedDict()
+        self._sync: Optional["SyncProductService"] = None
+        # Last health probe (monotonic time, result); failures expire sooner
+        self._health_ttl = 1.0
+        self._health_failure_ttl = 0.1
+        self._last_health: Tuple[float, bool] = (0.0, False)
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Pooled HTTP client shared by all calls, created on first use"""
+        if self._client is None or self._client.is_closed:
+            # HTTP/2 is negotiated when PRODUCT_SERVICE_URL is https; keep-alive
+            # expiry stays below the Product Service's keepAliveTimeout (65s)
+            self._client = httpx.AsyncClient(
+                http2=True,
+                base_url=self.base_url,
+                timeout=httpx.Timeout(self.timeout, connect=1.0),
+                limits=httpx.Limits(
+                    max_keepalive_connections=50,
+                    max_connections=100,
+                    keepalive_expiry=60.0
+                )
+            )
+        return self._client
+    
+    async def close(self):
+        """Close the pooled HTTP client and the sync facade's client, if any"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self._sync is not None:
+            await self._sync.aclose()
+            self._sync = None
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+    
+    @property
+    def sync(self) -> "SyncProductService":
+        """
+        Blocking API for sync callers, e.g. get_sync_product_service().get_product(pid)
         
-    async def get_product(self, product_id: str) -> Optional[Dict]:
+        Backed by its own ProductService on the background loop: a separate
+        cache and connection pool, closed together with this instance.
+        """
+        # Rebuilt if base_url was reconfigured (e.g. by the app lifespan) since
+        if self._sync is None or self._sync.base_url != self.base_url:
+            if self._sync is not None:
+                self._sync.close_soon()
+            self._sync = SyncProductService(self.base_url)
+        return self._sync
+    
+    @_retry_transient
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        stream: bool = False,
+        **kwargs
+    ) -> httpx.Response:
+        """
+        Send a request on the pooled client, retrying transient transport errors
+        
+        With stream=True the body is left unread and the caller must aclose() it.
+        """
+        request = self.client.build_request(method, url, **kwargs)
+        return await self.client.send(request, stream=stream)
+    
+    async def get_product(self, product_id: str) -> Optional[Product]:
         """
         Get a single product by ID from Product Service
         
@@ -32,77 +226,313 @@ class ProductService:
             product_id: The product ID to fetch
             
         Returns:
-            Product data dictionary or None if not found
+            Product record (full payload in .raw) or None if not found
             
         Raises:
             ProductServiceError: If there's an error communicating with the service
         """
+        cached = self._cache.get(product_id)
+        if cached is not None and time.monotonic() - cached[0] < self.cache_ttl:
+            self._cache.move_to_end(product_id)
+            return cached[1]
+        
+        # Concurrent callers for the same product share one request; shield it so
+        # a cancelled caller doesn't cancel the fetch for everyone else
+        task = self._inflight.get(product_id)
+        if task is None:
+            task = asyncio.create_task(self._fetch_product(product_id))
+            self._inflight[product_id] = task
+            task.add_done_callback(lambda t: self._fetch_done(product_id, t))
+        return await asyncio.shield(task)
+    
+    def _fetch_done(self, product_id: str, task: asyncio.Task):
+        """Cache a finished fetch and release its in-flight slot"""
+        succeeded = not task.cancelled() and task.exception() is None
+        # A fetch detached by invalidate() may carry stale data, don't cache it
+        if self._inflight.get(product_id) is not task:
+            return
+        del self._inflight[product_id]
+        if succeeded:
+            self._cache_put(product_id, task.result())
+    
+    def _cache_put(self, product_id: str, product: Optional[Product], fetched_at: Optional[float] = None):
+        """Store a fetched product (None for unknown IDs), evicting the least recently used"""
+        self._cache[product_id] = (time.monotonic() if fetched_at is None else fetched_at, product)
+        self._cache.move_to_end(product_id)
+        if len(self._cache) > _MAX_CACHED_PRODUCTS:
+            self._cache.popitem(last=False)
+    
+    def invalidate(self, product_id: str):
+        """Drop a cached product, e.g. after its stock changed"""
+        self._cache.pop(product_id, None)
+        # Later callers start a fresh fetch instead of joining one that began
+        # before the change
+        self._inflight.pop(product_id, None)
+    
+    async def _fetch_product(self, product_id: str) -> Optional[Product]:
+        """Fetch a single product from Product Service, revalidating by ETag"""
+        etag_entry = self._etag_cache.get(product_id)
+        if etag_entry is not None:
+            self._etag_cache.move_to_end(product_id)
+        headers = {"If-None-Match": etag_entry[0]} if etag_entry else None
+        
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(f"{self.base_url}/api/products/{product_id}")
-                
-                if response.status_code == 404:
-                    logger.warning("Product not found", product_id=product_id)
-                    return None
-                
-                if response.status_code != 200:
-                    logger.error(
-                        "Product service error",
-                        product_id=product_id,
-                        status_code=response.status_code,
-                        response=response.text
-                    )
-                    raise ProductServiceError(f"Product service returned {response.status_code}")
-                
-                data = response.json()
-                if not data.get('success'):
-                    logger.error("Product service returned unsuccessful response", data=data)
-                    raise ProductServiceError("Product service returned unsuccessful response")
-                
-                return data.get('data', {}).get('product')
-                
-        except httpx.TimeoutException:
-            logger.error("Product service timeout", product_id=product_id)
-            raise ProductServiceError("Product service timeout")
-        except httpx.RequestError as e:
-            logger.error("Product service request error", product_id=product_id, error=str(e))
-            raise ProductServiceError(f"Product service request error: {str(e)}")
-    
-    async def get_products_batch(self, product_ids: List[str]) -> Dict[str, Dict]:
+            response = await self._request("GET", f"/api/products/{product_id}", headers=headers)
+            
+            # Unchanged since our last fetch: reuse the parsed body
+            if response.status_code == 304 and etag_entry is not None:
+                return etag_entry[1]
+            
+            if response.status_code == 404:
+                self._etag_cache.pop(product_id, None)
+                logger.warning("Product not found", product_id=product_id)
+                return None
+            
+            if response.status_code != 200:
+                logger.error(
+                    "Product service error",
+                    product_id=product_id,
+                    status_code=response.status_code,
+                    response=response.text
+                )
+                error_cls = ProductServiceUnavailable if response.status_code >= 500 else ProductServiceError
+                raise error_cls(f"Product service returned {response.status_code}")
+            
+            payload = _decode_body(response.content).get('data')
+            raw = payload.get('product') if isinstance(payload, dict) else None
+            if raw is None:
+                return None
+            if not isinstance(raw, dict):
+                logger.error("Product service returned unexpected product", product_id=product_id)
+                raise ProductServiceError(f"Product service returned unexpected product {product_id}")
+            product = Product.from_raw(raw)
+            etag = response.headers.get("etag")
+            if etag:
+                self._etag_cache[product_id] = (etag, product)
+                self._etag_cache.move_to_end(product_id)
+                if len(self._etag_cache) > _MAX_CACHED_PRODUCTS:
+                    self._etag_cache.popitem(last=False)
+            return product
+            
+        except httpx.HTTPError as e:
+            logger.error(
+                "Product service request failed",
+                product_id=product_id,
+                error_type=type(e).__name__,
+                error=str(e)
+            )
+            raise ProductServiceUnavailable(f"{type(e).__name__}: {e}") from e
+    
+    async def get_products_batch(
+        self,
+        product_ids: List[str],
+        concurrency: int = _FETCH_CONCURRENCY
+    ) -> Tuple[Dict[str, Product], Dict[str, str]]:
         """
-        Get multiple products by their IDs
+        Get multiple products by their IDs in a single bulk request
+        
+        IDs still fresh in the product cache are served from it; only the
+        rest are requested, and the results are cached for later calls.
         
         Args:
             product_ids: List of product IDs to fetch
+            concurrency: Max per-product requests in flight if the bulk
+                endpoint is unavailable and we fall back to one GET per ID
             
         Returns:
-            Dictionary mapping product_id to product data
+            Tuple of (product_id -> Product, product_id -> fetch error).
+            Products that could not be fetched are reported in the error dict
+            instead of failing the whole batch; unknown IDs appear in neither.
             
         Raises:
-            ProductServiceError: If there's an error communicating with the service
+            ProductServiceError: If the bulk request itself fails
+            ProductServiceUnavailable: If the service is down; the per-ID
+                fallback stops at the first such failure
         """
         if not product_ids:
-            return {}
+            return {}, {}
+        
+        unique_ids = list(dict.fromkeys(product_ids))
         
-        # Create tasks for concurrent requests
-        tasks = [self.get_product(product_id) for product_id in product_ids]
+        # Serve fresh entries from the product cache and only fetch the rest
+        now = time.monotonic()
+        cached: Dict[str, Optional[Product]] = {}
+        misses = []
+        for pid in unique_ids:
+            entry = self._cache.get(pid)
+            if entry is not None and now - entry[0] < self.cache_ttl:
+                self._cache.move_to_end(pid)
+                cached[pid] = entry[1]
+            else:
+                misses.append(pid)
+        
+        products, errors = (
+            await self._fetch_products_batch(misses, concurrency) if misses else ({}, {})
+        )
+        
+        merged = {}
+        for pid in unique_ids:
+            product = cached[pid] if pid in cached else products.get(pid)
+            if product is not None:
+                merged[pid] = product
+        return merged, errors
+    
+    async def _fetch_products_batch(
+        self,
+        unique_ids: List[str],
+        concurrency: int
+    ) -> Tuple[Dict[str, Product], Dict[str, str]]:
+        """Fetch products for get_products_batch and cache what the bulk endpoint returns"""
+        # Large batches are decoded product by product as the body arrives,
+        # so the full response never sits in memory at once
+        stream = len(unique_ids) >= _STREAM_MIN_IDS
         
         try:
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            products = {}
-            for product_id, result in zip(product_ids, results):
-                if isinstance(result, Exception):
-                    logger.error("Error fetching product", product_id=product_id, error=str(result))
-                    raise ProductServiceError(f"Error fetching product {product_id}: {str(result)}")
-                elif result is not None:
-                    products[product_id] = result
-                    
-            return products
-            
-        except Exception as e:
-            logger.error("Batch product fetch error", product_ids=product_ids, error=str(e))
-            raise ProductServiceError(f"Batch product fetch error: {str(e)}")
+            response = await self._request(
+                "POST", "/api/products/batch", stream=stream, json={"ids": unique_ids}
+            )
+            try:
+                if response.status_code in (404, 405):
+                    # Product Service without the bulk endpoint, fetch one by one
+                    await response.aclose()
+                    return await self._get_products_individually(unique_ids, concurrency)
+                
+                if response.status_code != 200:
+                    await response.aread()
+                    logger.error(
+                        "Product service error",
+                        product_ids=unique_ids,
+                        status_code=response.status_code,
+                        response=response.text
+                    )
+                    error_cls = ProductServiceUnavailable if response.status_code >= 500 else ProductServiceError
+                    raise error_cls(f"Product service returned {response.status_code}")
+                
+                if stream:
+                    products = await self._stream_products(response)
+                else:
+                    payload = _decode_body(response.content).get('data')
+                    products = payload.get('products') if isinstance(payload, dict) else None
+                    if not isinstance(products, dict):
+                        logger.error("Product service returned unexpected response", product_ids=unique_ids)
+                        raise ProductServiceError("Product service returned unexpected response")
+            finally:
+                await response.aclose()
+        except httpx.HTTPError as e:
+            logger.error(
+                "Product service request failed",
+                product_ids=unique_ids,
+                error_type=type(e).__name__,
+                error=str(e)
+            )
+            raise ProductServiceUnavailable(f"{type(e).__name__}: {e}") from e
+        
+        # Unknown IDs are cached as None too, like a 404 from get_product
+        fetched_at = time.monotonic()
+        result = {}
+        for pid in unique_ids:
+            raw = products.get(pid)
+            if raw is not None and not isinstance(raw, dict):
+                logger.error("Product service returned unexpected product", product_id=pid)
+                raise ProductServiceError(f"Product service returned unexpected product {pid}")
+            product = Product.from_raw(raw) if raw is not None else None
+            self._cache_put(pid, product, fetched_at)
+            if product is not None:
+                result[pid] = product
+        return result, {}
+    
+    @staticmethod
+    async def _stream_products(response: httpx.Response) -> Dict[str, Dict]:
+        """
+        Incrementally decode a streamed bulk response in a single pass
+        
+        Reads the top-level success flag and builds each data.products entry
+        as its events arrive, failing like the buffered path on invalid JSON,
+        success=false or a missing data.products object.
+        """
+        products = {}
+        success = None
+        has_products = False
+        product_id = None
+        builder = None
+        depth = 0
+        try:
+            async for prefix, event, value in ijson.parse_async(
+                _AsyncByteReader(response.aiter_bytes()), use_float=True
+            ):
+                if builder is not None:
+                    # Inside one product's value until its nesting closes again
+                    builder.event(event, value)
+                    if event in ('start_map', 'start_array'):
+                        depth += 1
+                    elif event in ('end_map', 'end_array'):
+                        depth -= 1
+                    if depth == 0:
+                        products[product_id] = builder.value
+                        builder = None
+                elif prefix == 'data.products' and event == 'map_key':
+                    product_id, builder = value, ijson.ObjectBuilder()
+                elif prefix == 'data.products' and event == 'start_map':
+                    has_products = True
+                elif prefix == 'success':
+                    success = value
+                    if not success:
+                        break
+        except ijson.JSONError as e:
+            logger.error("Product service returned invalid JSON", error=str(e))
+            raise ProductServiceError(f"Product service returned invalid JSON: {e}") from e
+        
+        if not success:
+            logger.error("Product service returned unsuccessful response", success=success)
+            raise ProductServiceError("Product service returned unsuccessful response")
+        
+        if not has_products:
+            logger.error("Product service returned unexpected response")
+            raise ProductServiceError("Product service returned unexpected response")
+        return products
+    
+    async def _get_products_individually(
+        self,
+        product_ids: List[str],
+        concurrency: int
+    ) -> Tuple[Dict[str, Product], Dict[str, str]]:
+        """Fallback for get_products_batch: one GET per product ID, bounded"""
+        # Capped so a large order can't exhaust the connection pool; each
+        # fetch writes its own slot, so results stay in request order
+        results: List = [None] * len(product_ids)
+        sem = anyio.Semaphore(max(1, concurrency))
+        fatal: List[ProductServiceUnavailable] = []
+        
+        async def fetch(index: int, product_id: str):
+            async with sem:
+                try:
+                    results[index] = await self.get_product(product_id)
+                except ProductServiceUnavailable as e:
+                    # The remaining fetches would fail the same way, stop them now
+                    fatal.append(e)
+                    tg.cancel_scope.cancel()
+                except Exception as e:
+                    results[index] = e
+        
+        async with anyio.create_task_group() as tg:
+            for index, product_id in enumerate(product_ids):
+                tg.start_soon(fetch, index, product_id)
+        
+        if fatal:
+            logger.error("Product service unavailable, batch aborted", product_ids=product_ids)
+            raise fatal[0]
+        
+        # Keep whatever succeeded; failures are reported per product
+        products = {}
+        errors = {}
+        for product_id, result in zip(product_ids, results):
+            if isinstance(result, Exception):
+                logger.error("Error fetching product", product_id=product_id, error=str(result))
+                errors[product_id] = str(result)
+            elif result is not None:
+                products[product_id] = result
+        
+        return products, errors
     
     async def check_product_availability(self, product_id: str, quantity: int) -> Dict:
         """
@@ -121,7 +551,11 @@ class ProductService:
             }
         """
         product = await self.get_product(product_id)
-        
+        return self._eval_availability(product, quantity)
+    
+    @staticmethod
+    def _eval_availability(product: Optional[Product], quantity: int) -> Dict:
+        """Availability check for an already-fetched product (no I/O)"""
         if not product:
             return {
                 "available": False,
@@ -130,21 +564,21 @@ class ProductService:
                 "reason": "Product not found"
             }
         
-        if not product.get('isActive', False):
+        if not product.is_active:
             return {
                 "available": False,
-                "stock": product.get('stock', 0),
-                "product": product,
+                "stock": product.stock,
+                "product": product.raw,
                 "reason": "Product is not active"
             }
         
-        current_stock = product.get('stock', 0)
+        current_stock = product.stock
         available = current_stock >= quantity
         
         return {
             "available": available,
             "stock": current_stock,
-            "product": product,
+            "product": product.raw,
             "reason": None if available else f"Insufficient stock (need {quantity}, have {current_stock})"
         }
     
@@ -169,65 +603,50 @@ class ProductService:
             "errors": []
         }
         
-        # Get all product IDs
-        product_ids = [item.get('product_id') for item in order_items]
+        # Fill in missing fields once so items can be unpacked directly, and
+        # convert the expected price to cents here rather than per comparison
+        order_items = [{**_ITEM_DEFAULTS, **item} for item in order_items]
+        for item in order_items:
+            item['unit_price_cents'] = _cents(item['unit_price'])
+        product_ids = [item['product_id'] for item in order_items]
+        errors = validation_result["errors"]
+        item_results = validation_result["items"]
+        pids_missing = []
+        pids_price_mismatch = []
+        valid_count = 0
         
         try:
             # Fetch all products in batch
-            products = await self.get_products_batch(product_ids)
+            products, fetch_errors = await self.get_products_batch(product_ids)
             
-            for item in order_items:
-                product_id = item.get('product_id')
-                quantity = item.get('quantity', 0)
-                expected_price = item.get('unit_price', 0)
-                
-                # Check if product exists
-                if product_id not in products:
-                    validation_result["valid"] = False
-                    validation_result["errors"].append(f"Product {product_id} not found")
-                    validation_result["items"][product_id] = {
-                        "valid": False,
-                        "reason": "Product not found"
-                    }
-                    continue
-                
-                product = products[product_id]
-                
-                # Check availability
-                availability = await self.check_product_availability(product_id, quantity)
-                
-                if not availability["available"]:
-                    validation_result["valid"] = False
-                    validation_result["errors"].append(
-                        f"Product {product_id}: {availability['reason']}"
-                    )
-                    validation_result["items"][product_id] = {
-                        "valid": False,
-                        "reason": availability["reason"],
-                        "product": product
-                    }
-                    continue
-                
-                # Check price consistency (allow small differences for floating point)
-                actual_price = product.get('price', 0)
-                if abs(expected_price - actual_price) > 0.01:
-                    validation_result["valid"] = False
-                    validation_result["errors"].append(
-                        f"Product {product_id}: Price mismatch (expected {expected_price}, actual {actual_price})"
-                    )
-                    validation_result["items"][product_id] = {
-                        "valid": False,
-                        "reason": f"Price mismatch (expected {expected_price}, actual {actual_price})",
-                        "product": product
-                    }
+            # Validate items concurrently, bounded so large orders can't run away
+            sem = asyncio.Semaphore(_VALIDATION_CONCURRENCY)
+            results = await asyncio.gather(
+                *(self._validate_one(item, products, fetch_errors, sem) for item in order_items)
+            )
+            
+            for product_id, item_result, error, failure in results:
+                item_results[product_id] = item_result
+                if error is None:
+                    valid_count += 1
                     continue
-                
-                # Item is valid
-                validation_result["items"][product_id] = {
-                    "valid": True,
-                    "product": product,
-                    "available_stock": availability["stock"]
-                }
+                validation_result["valid"] = False
+                errors.append(error)
+                if failure == "missing":
+                    pids_missing.append(product_id)
+                elif failure == "price_mismatch":
+                    pids_price_mismatch.append(product_id)
+            
+            # One summary line per failed validation instead of a log per item;
+            # at warning so missing products stay visible at the deployed level
+            if not validation_result["valid"]:
+                logger.warning(
+                    "Order item validation failed",
+                    valid_count=valid_count,
+                    error_count=len(errors),
+                    pids_missing=pids_missing,
+                    pids_price_mismatch=pids_price_mismatch
+                )
             
             return validation_result
             
@@ -236,6 +655,74 @@ class ProductService:
             validation_result["errors"].append(f"Product service error: {str(e)}")
             return validation_result
     
+    async def _validate_one(
+        self,
+        item: Dict,
+        products: Dict[str, Product],
+        fetch_errors: Dict[str, str],
+        sem: asyncio.Semaphore
+    ) -> Tuple[str, Dict, Optional[str], Optional[str]]:
+        """Validate one order item once a concurrency slot is free"""
+        async with sem:
+            return self._check_item(item, products, fetch_errors)
+    
+    @staticmethod
+    def _check_item(
+        item: Dict,
+        products: Dict[str, Product],
+        fetch_errors: Dict[str, str]
+    ) -> Tuple[str, Dict, Optional[str], Optional[str]]:
+        """
+        Validate one normalized order item against the fetched products
+        
+        Pure CPU and no I/O, kept free of instance state so it can be swapped
+        for a compiled implementation if profiling ever shows it hot.
+        
+        Returns:
+            (product_id, item result, error message or None, failure kind or None)
+        """
+        product_id, quantity, expected_price, expected_cents = _item_fields(item)
+        
+        # Check if product exists (or could not be fetched)
+        product = products.get(product_id)
+        if product is None:
+            if product_id in fetch_errors:
+                reason = fetch_errors[product_id]
+                return product_id, {
+                    "valid": False,
+                    "reason": reason
+                }, f"Product {product_id}: {reason}", "fetch_error"
+            return product_id, {
+                "valid": False,
+                "reason": "Product not found"
+            }, f"Product {product_id} not found", "missing"
+        
+        # Check availability against the product we already fetched
+        availability = ProductService._eval_availability(product, quantity)
+        
+        if not availability["available"]:
+            return product_id, {
+                "valid": False,
+                "reason": availability["reason"],
+                "product": product.raw
+            }, f"Product {product_id}: {availability['reason']}", "unavailable"
+        
+        # Check price consistency in integer cents, report the original prices
+        if expected_cents != product.price_cents:
+            reason = f"Price mismatch (expected {expected_price}, actual {product.price})"
+            return product_id, {
+                "valid": False,
+                "reason": reason,
+                "product": product.raw
+            }, f"Product {product_id}: {reason}", "price_mismatch"
+        
+        # Item is valid
+        return product_id, {
+            "valid": True,
+            "product": product.raw,
+            "available_stock": availability["stock"]
+        }, None, None
+    
     async def reserve_products(self, order_items: List[Dict]) -> Dict:
         """
         Reserve products for an order (placeholder for future implementation)
@@ -256,12 +743,28 @@ class ProductService:
         validation_result = await self.validate_order_items(order_items)
         
         if validation_result["valid"]:
-            logger.info("Products reserved successfully", 
-                       product_ids=[item.get('product_id') for item in order_items])
+            product_ids = [item.get('product_id') for item in order_items]
+            for product_id in product_ids:
+                self.invalidate(product_id)
+            logger.debug("Products reserved successfully", product_ids=product_ids)
+            
+            # One clock read formatted by hand; the nanoseconds keep ids unique
+            # for reservations made within the same second
+            now_ns = time.time_ns()
+            dt = time.gmtime(now_ns // 1_000_000_000)
+            nanos = now_ns % 1_000_000_000
+            reservation_id = (
+                f"res_{dt.tm_year:04d}{dt.tm_mon:02d}{dt.tm_mday:02d}"
+                f"_{dt.tm_hour:02d}{dt.tm_min:02d}{dt.tm_sec:02d}_{nanos:09d}"
+            )
+            expires_at = (
+                f"{dt.tm_year:04d}-{dt.tm_mon:02d}-{dt.tm_mday:02d}"
+                f"T{dt.tm_hour:02d}:{dt.tm_min:02d}:{dt.tm_sec:02d}.{nanos // 1000:06d}+00:00"
+            )
             return {
                 "success": True,
-                "reservation_id": f"res_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}",
-                "expires_at": datetime.utcnow().isoformat(),
+                "reservation_id": reservation_id,
+                "expires_at": expires_at,
                 "items": validation_result["items"]
             }
         else:
@@ -279,14 +782,170 @@ class ProductService:
         Returns:
             True if service is healthy, False otherwise
         """
+        t = time.monotonic()
+        checked_at, healthy = self._last_health
+        ttl = self._health_ttl if healthy else self._health_failure_ttl
+        if checked_at and t - checked_at < ttl:
+            return healthy
+        
         try:
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                response = await client.get(f"{self.base_url}/health")
-                return response.status_code == 200
+            response = await self.client.get("/health")
+            healthy = response.status_code == 200
         except Exception as e:
             logger.error("Product service health check failed", error=str(e))
-            return False
+            healthy = False
+        
+        self._last_health = (t, healthy)
+        return healthy
+
+
+# Background event loop shared by all sync callers, so they reuse one
+# connection pool instead of paying for asyncio.run() per call
+_sync_loop: Optional[asyncio.AbstractEventLoop] = None
+_sync_loop_lock = threading.Lock()
+_sync_services: List["SyncProductService"] = []
+
+# Blocking calls give up after this many ProductService.timeout periods
+_SYNC_TIMEOUT_FACTOR = 3
+
+
+def _get_sync_loop() -> asyncio.AbstractEventLoop:
+    """Start the shared background loop on first use"""
+    global _sync_loop
+    with _sync_loop_lock:
+        if _sync_loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=loop.run_forever,
+                name="product-service-sync-loop",
+                daemon=True
+            ).start()
+            atexit.register(_shutdown_sync_loop)
+            _sync_loop = loop
+    return _sync_loop
+
+
+def _shutdown_sync_loop():
+    """Close sync clients and stop the background loop at process exit"""
+    loop = _sync_loop
+    if loop is None:
+        return
+    for service in _sync_services:
+        try:
+            asyncio.run_coroutine_threadsafe(service._service.close(), loop).result(timeout=5.0)
+        except Exception as e:
+            logger.error("Failed to close sync Product Service client", error=str(e))
+    loop.call_soon_threadsafe(loop.stop)
+
+
+def run_sync(coro, timeout: Optional[float] = None):
+    """
+    Run a coroutine on the shared background loop and block for its result
+    
+    Args:
+        coro: Coroutine to run
+        timeout: Seconds to wait before cancelling it (None waits indefinitely)
+        
+    Raises:
+        RuntimeError: If called from a thread with a running event loop, where
+            blocking would stall that loop (or deadlock the background loop)
+        ProductServiceUnavailable: If the call does not finish within timeout
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        pass
+    else:
+        coro.close()
+        raise RuntimeError("run_sync() called from a running event loop; await the coroutine instead")
+    
+    future = asyncio.run_coroutine_threadsafe(coro, _get_sync_loop())
+    try:
+        return future.result(timeout=timeout)
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        raise ProductServiceUnavailable(f"Product service call timed out after {timeout}s")
+
+
+class SyncProductService:
+    """Blocking facade over a ProductService that lives on the background loop"""
+    
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+        # A dedicated instance: its pooled client must stay on the background loop
+        self._service = ProductService(base_url)
+        # Upper bound per blocking call: room for transport retries and the
+        # per-ID fallback on top of a single request timeout
+        self.call_timeout = self._service.timeout * _SYNC_TIMEOUT_FACTOR
+        _sync_services.append(self)
+    
+    def close_soon(self) -> Optional[concurrent.futures.Future]:
+        """Stop tracking this facade and schedule its client to close on the background loop"""
+        if self in _sync_services:
+            _sync_services.remove(self)
+        if _sync_loop is None:
+            return None
+        return asyncio.run_coroutine_threadsafe(self._service.close(), _sync_loop)
+    
+    async def aclose(self):
+        """Close this facade's client without blocking the calling event loop"""
+        future = self.close_soon()
+        if future is not None:
+            await asyncio.wrap_future(future)
+    
+    def get_product(self, product_id: str) -> Optional[Product]:
+        return run_sync(self._service.get_product(product_id), self.call_timeout)
+    
+    def get_products_batch(
+        self,
+        product_ids: List[str],
+        concurrency: int = _FETCH_CONCURRENCY
+    ) -> Tuple[Dict[str, Product], Dict[str, str]]:
+        return run_sync(self._service.get_products_batch(product_ids, concurrency), self.call_timeout)
+    
+    def check_product_availability(self, product_id: str, quantity: int) -> Dict:
+        return run_sync(self._service.check_product_availability(product_id, quantity), self.call_timeout)
+    
+    def validate_order_items(self, order_items: List[Dict]) -> Dict:
+        return run_sync(self._service.validate_order_items(order_items), self.call_timeout)
+    
+    def reserve_products(self, order_items: List[Dict]) -> Dict:
+        return run_sync(self._service.reserve_products(order_items), self.call_timeout)
+    
+    def health_check(self) -> bool:
+        return run_sync(self._service.health_check(), self.call_timeout)
+
+
+@lru_cache(maxsize=1)
+def _product_service() -> ProductService:
+    return ProductService()
+
+
+async def get_product_service() -> ProductService:
+    """
+    Per-process ProductService, created on first use inside the running loop
+    
+    Usable directly or as a FastAPI dependency; the app lifespan configures it
+    on startup and closes it (see reset_product_service) on shutdown. Sync code
+    should use get_sync_product_service() instead.
+    """
+    return _product_service()
+
+
+def get_sync_product_service() -> SyncProductService:
+    """
+    Blocking Product Service API for sync callers
+    
+    The facade wraps its own ProductService on the shared background loop, so
+    no event loop is created per call. Its cache and connection pool are
+    separate from the async per-process instance, which owns and closes it
+    (see reset_product_service). Must not be used from async code (see run_sync).
+    """
+    return _product_service().sync
 
 
-# Global instance
-product_service = ProductService()
+async def reset_product_service():
+    """Close the per-process ProductService; the next call builds a fresh one"""
+    if _product_service.cache_info().currsize:
+        await _product_service().close()
+        _product_service.cache_clear()
@@ -0,0 +1,9 @@
+"""
+Shared test setup for the Order Processing Service
+"""
+
+import os
+import sys
+
+# Tests import service modules the same way main.py does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,143 @@
+"""
+Tests for the Product Service integration, run against a mocked transport
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from services import product_service as product_service_module
+from services.product_service import ProductService, ProductServiceError, _STREAM_MIN_IDS
+
+
+def make_service(handler) -> ProductService:
+    """ProductService whose pooled client is served by handler"""
+    service = ProductService("http://product-service")
+    service._client = httpx.AsyncClient(
+        transport=httpx.MockTransport(handler),
+        base_url=service.base_url
+    )
+    return service
+
+
+def respond_with(status_code: int, content: bytes):
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(status_code, content=content)
+    return handler
+
+
+BUFFERED_IDS = ["prod-001", "prod-002"]
+STREAMED_IDS = [f"prod-{i:03d}" for i in range(_STREAM_MIN_IDS)]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("product_ids", [BUFFERED_IDS, STREAMED_IDS], ids=["buffered", "streamed"])
+async def test_batch_non_json_body_raises_product_service_error(product_ids):
+    service = make_service(respond_with(200, b"<html>Bad Gateway</html>"))
+    
+    with pytest.raises(ProductServiceError):
+        await service.get_products_batch(product_ids)
+    
+    await service.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("product_ids", [BUFFERED_IDS, STREAMED_IDS], ids=["buffered", "streamed"])
+@pytest.mark.parametrize("content", [b"[]", b'"ok"', b'{"success": true, "data": []}'])
+async def test_batch_unexpected_shape_raises_product_service_error(product_ids, content):
+    service = make_service(respond_with(200, content))
+    
+    with pytest.raises(ProductServiceError):
+        await service.get_products_batch(product_ids)
+    
+    await service.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("product_ids", [BUFFERED_IDS, STREAMED_IDS], ids=["buffered", "streamed"])
+async def test_validation_fails_cleanly_on_non_json_body(product_ids):
+    service = make_service(respond_with(200, b"not json"))
+    items = [{"product_id": pid, "quantity": 1, "unit_price": 1.0} for pid in product_ids]
+    
+    result = await service.validate_order_items(items)
+    
+    assert result["valid"] is False
+    assert result["errors"][0].startswith("Product service error:")
+    await service.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("content", [b"<html>Bad Gateway</html>", b"[]", b'{"success": true, "data": {"product": 1}}'])
+async def test_get_product_malformed_body_raises_product_service_error(content):
+    service = make_service(respond_with(200, content))
+    
+    with pytest.raises(ProductServiceError):
+        await service.get_product("prod-001")
+    
+    await service.close()
+
+
+def product_payload(product_id: str, stock: int = 5) -> dict:
+    return {"id": product_id, "price": 9.99, "stock": stock, "isActive": True}
+
+
+@pytest.mark.asyncio
+async def test_product_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(product_service_module, "_MAX_CACHED_PRODUCTS", 3)
+    
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"success": True, "data": {"products": {}}})
+    
+    service = make_service(handler)
+    for i in range(10):
+        await service.get_products_batch([f"unknown-{i}"])
+    
+    assert list(service._cache) == ["unknown-7", "unknown-8", "unknown-9"]
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_invalidate_discards_in_flight_fetch():
+    entered = asyncio.Event()
+    release = asyncio.Event()
+    stock = {"value": 5}
+    
+    async def handler(request: httpx.Request) -> httpx.Response:
+        payload = product_payload("prod-001", stock["value"])
+        entered.set()
+        await release.wait()
+        return httpx.Response(200, json={"success": True, "data": {"product": payload}})
+    
+    service = make_service(handler)
+    stale = asyncio.create_task(service.get_product("prod-001"))
+    await entered.wait()
+    
+    stock["value"] = 1
+    service.invalidate("prod-001")
+    fresh = asyncio.create_task(service.get_product("prod-001"))
+    await asyncio.sleep(0)
+    release.set()
+    
+    assert (await stale).stock == 5
+    assert (await fresh).stock == 1
+    assert service._cache["prod-001"][1].stock == 1
+    await service.close()
+
+
+def test_sync_facade_closed_with_its_owner():
+    service = ProductService("http://product-service")
+    facade = service.sync
+    product_service_module._get_sync_loop()
+    assert facade._service.client is not None
+    
+    service.base_url = "http://product-service-2"
+    replacement = service.sync
+    assert replacement is not facade
+    assert facade not in product_service_module._sync_services
+    
+    replacement._service.client
+    asyncio.run(service.close())
+    assert replacement not in product_service_module._sync_services
+    assert replacement._service._client is None
+    assert service._sync is None
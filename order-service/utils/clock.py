@@ -0,0 +1,21 @@
+"""
+Clock helpers for SpookyMart Order Processing Service
+Cheap timestamps for hot request paths
+"""
+
+import time
+from datetime import datetime, timezone
+
+_UTC = timezone.utc
+
+# [epoch second, ISO string] for the last second we formatted
+_iso_cache = [0, ""]
+
+
+def iso_now() -> str:
+    """Current UTC time as an ISO string, reformatted at most once per second"""
+    t = int(time.time())
+    if t != _iso_cache[0]:
+        _iso_cache[0] = t
+        _iso_cache[1] = datetime.fromtimestamp(t, _UTC).isoformat()
+    return _iso_cache[1]
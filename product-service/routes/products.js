@@ -130,6 +130,49 @@ router.get('/:id', async (req, res) => {
   }
 });
 
+/**
+ * POST /products/batch
+ * Retrieve several products by ID in a single request
+ * Body: { "ids": ["prod-001", "prod-002"] }
+ * Unknown IDs are omitted from the response
+ */
+router.post('/batch', async (req, res) => {
+  try {
+    const ids = req.body && req.body.ids;
+
+    if (!Array.isArray(ids)) {
+      return res.status(400).json({
+        success: false,
+        error: 'Bad Request',
+        message: 'Request body must contain an "ids" array'
+      });
+    }
+
+    const products = await readProducts();
+    const productsById = new Map(products.map(p => [p.id, p]));
+
+    const found = {};
+    for (const id of ids) {
+      const product = productsById.get(id);
+      if (product) {
+        found[id] = product;
+      }
+    }
+
+    res.json({
+      success: true,
+      data: { products: found }
+    });
+  } catch (error) {
+    console.error('Error fetching product batch:', error);
+    res.status(500).json({
+      success: false,
+      error: 'Internal Server Error',
+      message: 'Failed to fetch products'
+    });
+  }
+});
+
 /**
  * POST /products
  * Create a new product
@@ -84,6 +84,7 @@ app.get('/', (req, res) => {
       products: {
         list: 'GET /api/products',
         get: 'GET /api/products/:id',
+        batch: 'POST /api/products/batch',
         create: 'POST /api/products',
         update: 'PUT /api/products/:id',
         delete: 'DELETE /api/products/:id',
@@ -112,6 +113,7 @@ app.use('*', (req, res) => {
       'GET /health',
       'GET /api/products',
       'GET /api/products/:id',
+      'POST /api/products/batch',
       'POST /api/products',
       'PUT /api/products/:id',
       'DELETE /api/products/:id',
@@ -194,4 +196,9 @@ server = app.listen(PORT, '0.0.0.0', () => {
   }
 });
 
+// Keep idle connections open longer than the Order Service's pooled client
+// (60s keep-alive) so it never reuses a socket the server is closing
+server.keepAliveTimeout = 65000;
+server.headersTimeout = 66000;
+
 module.exports = app;